@@ -0,0 +1,12 @@
+# Production server config, picked up automatically by:
+#   gunicorn lifeline:app
+# (run from this directory, next to lifeline.py)
+import os
+
+bind = os.getenv("LIFELINE_BIND", "0.0.0.0:5000")
+
+# 4 processes x 8 threads = 32 concurrent requests; with SQLite in WAL mode
+# dashboard reads keep going while /sos writes.
+worker_class = "gthread"
+workers = int(os.getenv("LIFELINE_WORKERS", "4"))
+threads = int(os.getenv("LIFELINE_THREADS", "8"))
@@ -1,7 +1,12 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash
-import sqlite3, datetime, os
+from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, g, Response, session
+import sqlite3, os, functools, re, json, threading, atexit, stat, queue, contextlib, time, itertools
+import jinja2
+from urllib.parse import quote
 from openai import OpenAI
 from dotenv import load_dotenv
+from celery import Celery
+from celery.result import AsyncResult
+import redis
 
 # ----------------- LOAD ENV -----------------
 load_dotenv()  # loads .env file into environment
@@ -10,29 +15,226 @@ load_dotenv()  # loads .env file into environment
 app = Flask(__name__)
 app.secret_key = "lifeline-secret"
 
+# Compiled templates are cached on disk so each worker compiles them once
+# (Jinja's default dir is per-user, mode 0700 and owner-checked)
+app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache()
+TEMPLATES = [
+    "base.html", "home.html", "sos.html", "triage.html", "profile.html",
+    "contacts.html", "first_aid.html", "dashboard.html",
+]
+
 # OpenAI setup using API key from .env
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+_HAS_LLM = bool(OPENAI_API_KEY)  # without a key, skip straight to rule-based triage
+LLM_TIMEOUT = 2.0  # seconds before falling back to rule-based triage
+# one pooled client reused across calls; no retries so a slow API falls back quickly
+client = OpenAI(api_key=OPENAI_API_KEY, timeout=LLM_TIMEOUT, max_retries=0) if _HAS_LLM else None
+
+# Celery runs the slow OpenAI call off the request thread.
+# Without CELERY_BROKER_URL tasks run inline (eager), so no Redis is needed for demos.
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
+celery = Celery(
+    "lifeline",
+    broker=CELERY_BROKER_URL or "redis://localhost:6379/0",
+    backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1"),
+)
+celery.conf.task_always_eager = not CELERY_BROKER_URL
+
+# Redis pub/sub fans new alerts out to dashboards on every worker.
+# Without REDIS_URL alerts are only pushed to clients of the same process.
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+ALERTS_CHANNEL = "lifeline:alerts"
+SSE_KEEPALIVE = 15  # seconds between keep-alive comments on idle streams
+# Without Redis, alerts posted to other workers are only seen by polling the DB
+SSE_POLL_INTERVAL = SSE_KEEPALIVE if redis_client is not None else 3
+# Open /alerts/stream connections allowed per process. Each one holds a worker
+# thread, so by default use half of gunicorn's threads and leave the rest for /sos.
+MAX_ALERT_STREAMS = int(os.getenv("LIFELINE_MAX_STREAMS",
+                                  int(os.getenv("LIFELINE_THREADS", "8")) // 2))
+
+def private_ram_dir():
+    """
+    Return a per-user 0700 directory on tmpfs for the live DB, or None.
+    /dev/shm is world-writable, so the directory must be ours and private.
+    """
+    if not os.path.isdir("/dev/shm") or not hasattr(os, "getuid"):
+        return None
+    path = f"/dev/shm/lifeline-{os.getuid()}"
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        app.logger.warning("%s is not a private directory, keeping the database on disk", path)
+        return None
+    return path
+
+
+# Database files: the live DB sits on tmpfs (RAM) when available and is
+# snapshotted back to the on-disk copy every SNAPSHOT_INTERVAL seconds
+DISK_DB_FILE = os.getenv("LIFELINE_DISK_DB", "lifeline.db")
+DB_FILE = os.getenv("LIFELINE_DB")
+if not DB_FILE:
+    _ram_dir = private_ram_dir()
+    DB_FILE = os.path.join(_ram_dir, "lifeline.db") if _ram_dir else DISK_DB_FILE
+SNAPSHOT_INTERVAL = 30
+
+# Max alerts shown on the dashboard, and rows pulled per fetchmany() batch
+DASHBOARD_LIMIT = 200
+FETCH_BATCH = 500
+
+# Seconds a rendered dashboard stays in Redis
+DASHBOARD_CACHE_TTL = 60
 
-# Database file
-DB_FILE = "lifeline.db"
+# Bumped whenever init_db() gains new DDL; stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+# Idle read-only connections kept per process
+READ_POOL_SIZE = 8
 
 
 # ----------------- DATABASE -----------------
+# SQL text is kept constant so sqlite3's per-connection statement cache
+# reuses the prepared statement instead of re-parsing it on every request.
+# created_at is computed by SQLite; it stays in the VALUES list because databases
+# created before the column got its DEFAULT would otherwise store NULL
+SQL_INSERT_ALERT = """
+    INSERT INTO alerts (created_at, lat, lng, triage_level, notes)
+    VALUES (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), ?, ?, ?, ?)
+    RETURNING id, created_at
+"""
+
+SQL_UPSERT_PROFILE = """
+    INSERT INTO profile (
+        id, full_name, age, blood_group, language, allergies, conditions,
+        emergency_contact_name, emergency_contact_phone
+    ) VALUES (1,?,?,?,?,?,?,?,?)
+    ON CONFLICT(id) DO UPDATE SET
+        full_name=excluded.full_name,
+        age=excluded.age,
+        blood_group=excluded.blood_group,
+        language=excluded.language,
+        allergies=excluded.allergies,
+        conditions=excluded.conditions,
+        emergency_contact_name=excluded.emergency_contact_name,
+        emergency_contact_phone=excluded.emergency_contact_phone
+"""
+
+SQL_SELECT_PROFILE = "SELECT * FROM profile WHERE id=1"
+
+SQL_SELECT_MAX_ALERT_ID = "SELECT MAX(id) FROM alerts"
+
+SQL_SELECT_ALERTS = """
+    SELECT id, created_at, lat, lng, triage_level, notes
+    FROM alerts WHERE id <= ? ORDER BY id DESC LIMIT ?
+"""
+
+SQL_SELECT_ALERTS_AFTER = """
+    SELECT id, created_at, lat, lng, triage_level, notes
+    FROM alerts WHERE id > ? ORDER BY id LIMIT ?
+"""
+
+
+def connect_db(readonly=False):
+    """Open a connection with per-connection PRAGMAs tuned for the app."""
+    if readonly:
+        conn = sqlite3.connect(f"file:{quote(DB_FILE)}?mode=ro", uri=True,
+                               cached_statements=256, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(DB_FILE, cached_statements=256, check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # allows column-name access
+    cur = conn.cursor()
+    cur.execute("PRAGMA synchronous=NORMAL")   # safe with WAL, no fsync per commit
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-20000")    # ~20 MB page cache
+    cur.execute("PRAGMA busy_timeout=5000")    # wait on locks instead of SQLITE_BUSY
+    cur.execute("PRAGMA wal_autocheckpoint=1000")  # fsync at checkpoints, not per commit
+    return conn
+
+
+# Reads come from a pool of read-only connections so they never contend for
+# the write lock; all writes in a process go through one locked connection.
+_read_pool = queue.Queue(maxsize=READ_POOL_SIZE)
+_write_conn = None
+_write_lock = threading.Lock()
+
+
+def get_read_db():
+    """Return a pooled read-only connection for the current request."""
+    if "read_db" not in g:
+        try:
+            g.read_db = _read_pool.get_nowait()
+        except queue.Empty:
+            g.read_db = connect_db(readonly=True)
+    return g.read_db
+
+
+@contextlib.contextmanager
+def write_db():
+    """Hold the writer connection; commits on exit, rolls back on error."""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            _write_conn = connect_db()
+        # grab the write lock up front instead of upgrading mid-transaction
+        _write_conn.execute("BEGIN IMMEDIATE")
+        with _write_conn:
+            yield _write_conn
+
+
+def iter_rows(cur, size=FETCH_BATCH):
+    """Yield rows from `cur` in fetchmany() batches instead of one big fetchall()."""
+    while True:
+        rows = cur.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def load_profile():
+    """Return the saved profile as a dict ({} if none saved yet)."""
+    row = get_read_db().execute(SQL_SELECT_PROFILE).fetchone()
+    return dict(row) if row else {}
+
+
+@app.teardown_appcontext
+def release_db(e=None):
+    """Return the request's read connection to the pool, if one was taken."""
+    db = g.pop("read_db", None)
+    if db is not None:
+        try:
+            _read_pool.put_nowait(db)
+        except queue.Full:
+            db.close()
+
+
 def init_db():
-    """Initialize database with required tables."""
-    with sqlite3.connect(DB_FILE) as conn:
+    """Initialize database with required tables (once per SCHEMA_VERSION)."""
+    with connect_db() as conn:
         cur = conn.cursor()
+        # WAL lets dashboard reads run alongside SOS writes (persistent per DB file)
+        if DB_FILE != ":memory:":
+            cur.execute("PRAGMA journal_mode=WAL")
+        # already bootstrapped (e.g. by another worker): skip the DDL
+        cur.execute("PRAGMA user_version")
+        if cur.fetchone()[0] >= SCHEMA_VERSION:
+            return
         # Alerts table
         cur.execute("""
         CREATE TABLE IF NOT EXISTS alerts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            created_at TEXT,
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
             lat REAL,
             lng REAL,
             triage_level TEXT,
             notes TEXT
         )
         """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts(created_at DESC)")
         # Profile table
         cur.execute("""
         CREATE TABLE IF NOT EXISTS profile (
@@ -47,17 +249,219 @@ def init_db():
             emergency_contact_phone TEXT
         )
         """)
+        cur.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
         conn.commit()
 
+
+def copy_db(src_file, dst_file):
+    """Copy one SQLite database onto another with the online backup API."""
+    src, dst = sqlite3.connect(src_file), sqlite3.connect(dst_file)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def restore_db():
+    """Seed the RAM database from the on-disk snapshot on first start."""
+    if DB_FILE == DISK_DB_FILE:
+        return
+    import fcntl  # POSIX only, and only needed on the tmpfs path
+    # lock so concurrently booting workers don't restore over each other's writes
+    with open(DB_FILE + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(DB_FILE) and os.path.exists(DISK_DB_FILE):
+            copy_db(DISK_DB_FILE, DB_FILE)
+
+
+def snapshot_db():
+    """Persist the RAM database to disk."""
+    if DB_FILE != DISK_DB_FILE:
+        copy_db(DB_FILE, DISK_DB_FILE)
+
+
+def _snapshot_loop():
+    try:
+        snapshot_db()
+    except sqlite3.Error:
+        app.logger.exception("Database snapshot failed")
+    start_snapshots()
+
+
+def start_snapshots():
+    """Schedule the next periodic snapshot."""
+    timer = threading.Timer(SNAPSHOT_INTERVAL, _snapshot_loop)
+    timer.daemon = True
+    timer.start()
+
+
+# Only one process snapshots: whoever holds this lock for its lifetime.
+_snapshot_lock = None
+_next_snapshot_claim = 0.0
+
+
+def claim_snapshots():
+    """Become the snapshot owner if no other process is; returns True on success."""
+    global _snapshot_lock
+    import fcntl  # POSIX only, and only needed on the tmpfs path
+    try:
+        lock = open(DB_FILE + ".snapshot.lock", "w")
+    except OSError:
+        app.logger.exception("Cannot open snapshot lock, not snapshotting")
+        return False
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:  # BlockingIOError: another process owns the snapshots
+        lock.close()
+        return False
+    _snapshot_lock = lock
+    start_snapshots()
+    atexit.register(snapshot_db)
+    return True
+
+
+@app.before_request
+def ensure_snapshot_owner():
+    """Let a web process take over snapshots (the Celery worker never serves requests)."""
+    global _next_snapshot_claim
+    if DB_FILE == DISK_DB_FILE or _snapshot_lock is not None:
+        return
+    # retry periodically so another worker takes over if the owner exits
+    now = time.monotonic()
+    if now >= _next_snapshot_claim:
+        _next_snapshot_claim = now + SNAPSHOT_INTERVAL
+        claim_snapshots()
+
+
+restore_db()
 init_db()
 
 
+# ----------------- LIVE ALERTS -----------------
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+
+def publish_alert(alert):
+    """Push a new alert to every open /alerts/stream."""
+    data = json.dumps(alert)
+    if redis_client is not None:
+        try:
+            redis_client.publish(ALERTS_CHANNEL, data)
+        except redis.RedisError:
+            # the alert is already saved; dashboards catch up from the DB on reconnect
+            app.logger.exception("Publishing alert %s failed", alert["id"])
+        return
+    with _subscribers_lock:
+        for q in _subscribers:
+            try:
+                q.put_nowait(data)
+            except queue.Full:  # stalled client, drop rather than block /sos
+                pass
+
+
+def alert_events():
+    """
+    Yield published alerts as dicts.
+    None is yielded once subscribed and after every SSE_POLL_INTERVAL idle seconds.
+    """
+    if redis_client is not None:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(ALERTS_CHANNEL)
+        try:
+            yield None
+            while True:
+                msg = pubsub.get_message(timeout=SSE_POLL_INTERVAL)
+                yield json.loads(msg["data"]) if msg else None
+        finally:
+            pubsub.close()
+        return
+
+    q = queue.Queue(maxsize=100)
+    with _subscribers_lock:
+        _subscribers.add(q)
+    try:
+        yield None
+        while True:
+            try:
+                yield json.loads(q.get(timeout=SSE_POLL_INTERVAL))
+            except queue.Empty:
+                yield None
+    finally:
+        with _subscribers_lock:
+            _subscribers.discard(q)
+
+
+# ----------------- PAGE CACHE -----------------
+# Without Redis only the latest render is kept, in process
+_local_page = (None, None)
+
+
+def get_cached_page(key):
+    """Return cached HTML for `key`, or None (also when Redis is unreachable)."""
+    if redis_client is not None:
+        try:
+            html = redis_client.get(key)
+        except redis.RedisError:
+            app.logger.warning("Page cache read failed, rendering instead", exc_info=True)
+            return None
+        return html.decode() if html is not None else None
+    cached_key, html = _local_page
+    return html if cached_key == key else None
+
+
+def set_cached_page(key, html, ttl):
+    """Cache rendered HTML under `key` for `ttl` seconds; skipped if Redis fails."""
+    global _local_page
+    if redis_client is not None:
+        try:
+            redis_client.setex(key, ttl, html)
+        except redis.RedisError:
+            app.logger.warning("Page cache write failed", exc_info=True)
+    else:
+        _local_page = (key, html)
+
+
 # ----------------- AI TRIAGE -----------------
+# one compiled pass over the (lowercased) text per class instead of a substring
+# scan per keyword; plain substrings on purpose so the fallback over-triages
+CRITICAL_RE = re.compile(r"bleeding|unconscious|heart")
+URGENT_RE = re.compile(r"pain|fever")
+
+
+# only inputs up to this length are memoized, so the cache stays small in memory
+RULE_CACHE_MAX_LEN = 256
+
+
+def _classify(symptoms_lower: str) -> str:
+    if CRITICAL_RE.search(symptoms_lower):
+        return "Critical (fallback)"
+    if URGENT_RE.search(symptoms_lower):
+        return "Urgent (fallback)"
+    return "Non-Urgent (fallback)"
+
+
+_classify_cached = functools.lru_cache(maxsize=4096)(_classify)
+
+
+def _rule_triage(symptoms_lower: str) -> str:
+    """Rule-based fallback triage on already-lowercased symptoms."""
+    if len(symptoms_lower) <= RULE_CACHE_MAX_LEN:
+        return _classify_cached(symptoms_lower)
+    return _classify(symptoms_lower)
+
+
 def ai_triage(symptoms: str) -> str:
     """
     Try AI triage first (OpenAI).
-    If it fails, fallback to rule-based logic.
+    If it fails or takes longer than LLM_TIMEOUT, fallback to rule-based logic.
     """
+    if not _HAS_LLM:
+        return _rule_triage(symptoms.lower())
+
     prompt = f"""
     You are an AI triage assistant. Classify the following patient symptoms:
     - Critical: life-threatening, needs immediate care.
@@ -78,12 +482,13 @@ def ai_triage(symptoms: str) -> str:
         return response.choices[0].message.content.strip()
     except Exception:
         # ---- fallback logic ----
-        text = symptoms.lower()
-        if "bleeding" in text or "unconscious" in text or "heart" in text:
-            return "Critical (fallback)"
-        elif "pain" in text or "fever" in text:
-            return "Urgent (fallback)"
-        return "Non-Urgent (fallback)"
+        return _rule_triage(symptoms.lower())
+
+
+@celery.task
+def ai_triage_task(symptoms: str) -> str:
+    """Celery task wrapper around ai_triage."""
+    return ai_triage(symptoms)
 
 
 # ----------------- ROUTES -----------------
@@ -93,15 +498,19 @@ def home():
     return render_template("home.html")
 
 
+# Dummy ambulance data (replace with Nokia API later), serialized once at import
+AMBULANCES = [
+    {"id": 1, "name": "Ambulance A", "lat": 28.6139, "lng": 77.2090, "status": "available"},
+    {"id": 2, "name": "Ambulance B", "lat": 28.6200, "lng": 77.2150, "status": "busy"},
+    {"id": 3, "name": "Ambulance C", "lat": 28.6250, "lng": 77.2000, "status": "available"},
+]
+_AMBULANCES_JSON = json.dumps(AMBULANCES)
+
+
 @app.route("/api/ambulances")
 def api_ambulances():
     """Dummy ambulance data (replace with Nokia API later)."""
-    dummy_ambulances = [
-        {"id": 1, "name": "Ambulance A", "lat": 28.6139, "lng": 77.2090, "status": "available"},
-        {"id": 2, "name": "Ambulance B", "lat": 28.6200, "lng": 77.2150, "status": "busy"},
-        {"id": 3, "name": "Ambulance C", "lat": 28.6250, "lng": 77.2000, "status": "available"},
-    ]
-    return jsonify(dummy_ambulances)
+    return Response(_AMBULANCES_JSON, mimetype="application/json")
 
 
 @app.route("/sos", methods=["GET", "POST"])
@@ -113,13 +522,10 @@ def sos():
         lat, lng = 28.61, 77.20  # stubbed location
         triage = "Critical"      # stubbed triage
 
-        with sqlite3.connect(DB_FILE) as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO alerts (created_at, lat, lng, triage_level, notes)
-                VALUES (?, ?, ?, ?, ?)
-            """, (datetime.datetime.now().isoformat(), lat, lng, triage, notes))
-            conn.commit()
+        with write_db() as conn:
+            alert_id, created_at = conn.execute(SQL_INSERT_ALERT, (lat, lng, triage, notes)).fetchone()
+        publish_alert({"id": alert_id, "created_at": created_at, "lat": lat, "lng": lng,
+                       "triage_level": triage, "notes": notes})
 
         status = "🚑 SOS sent! Nearest ambulance being dispatched."
         flash(status)
@@ -132,70 +538,64 @@ def sos():
 @app.route("/triage", methods=["GET", "POST"])
 def triage():
     """AI symptom triage page."""
-    triage_result, symptoms_text, notes = None, "", ""
+    triage_result, task_id, symptoms_text, notes = None, None, "", ""
     if request.method == "POST":
         symptoms_text = request.form.get("symptoms", "")
         notes = request.form.get("notes", "")
-        if symptoms_text:
-            triage_result = ai_triage(symptoms_text)
+        if symptoms_text and not _HAS_LLM:
+            triage_result = _rule_triage(symptoms_text.lower())
+        elif symptoms_text:
+            task = ai_triage_task.delay(symptoms_text)
+            if task.ready():  # eager mode: result is already there
+                triage_result = task.get()
+            else:             # queued on a worker: page polls /triage/status
+                task_id = task.id
 
     return render_template("triage.html",
                            triage=triage_result,
+                           task_id=task_id,
                            symptoms=symptoms_text,
                            notes=notes)
 
 
+@app.route("/triage/status/<task_id>")
+def triage_status(task_id):
+    """Poll the result of a queued triage task."""
+    result = AsyncResult(task_id, app=celery)
+    if not result.ready():
+        return jsonify(status="pending")
+    if result.failed():
+        return jsonify(status="failed"), 500
+    return jsonify(status="done", triage=result.get(timeout=0))
+
+
 @app.route("/profile", methods=["GET", "POST"])
 def profile():
-    profile_data = {}
     if request.method == "POST":
-        with sqlite3.connect(DB_FILE) as conn:
-            cur = conn.cursor()
-            # overwrite existing profile
-            cur.execute("DELETE FROM profile")
-            cur.execute("""
-                INSERT INTO profile (
-                    id, full_name, age, blood_group, language, allergies, conditions,
-                    emergency_contact_name, emergency_contact_phone
-                ) VALUES (1,?,?,?,?,?,?,?,?)
-            """, (
-                request.form.get("full_name"),
-                request.form.get("age"),
-                request.form.get("blood_group"),
-                request.form.get("language"),
-                request.form.get("allergies"),
-                request.form.get("conditions"),
-                request.form.get("emergency_contact_name"),
-                request.form.get("emergency_contact_phone")
-            ))
-            conn.commit()
+        # read the form before taking the writer lock so it is held only for the SQL
+        values = (
+            request.form.get("full_name"),
+            request.form.get("age"),
+            request.form.get("blood_group"),
+            request.form.get("language"),
+            request.form.get("allergies"),
+            request.form.get("conditions"),
+            request.form.get("emergency_contact_name"),
+            request.form.get("emergency_contact_phone")
+        )
+        with write_db() as conn:
+            # single-row profile: insert or overwrite in one statement
+            conn.execute(SQL_UPSERT_PROFILE, values)
         flash("Profile saved.")
         return redirect(url_for("profile"))
 
-    # fetch saved profile safely with dict mapping
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.row_factory = sqlite3.Row  # allows column-name access
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM profile WHERE id=1")
-        row = cur.fetchone()
-        if row:
-            profile_data = dict(row)
-
-    return render_template("profile.html", p=profile_data)
+    return render_template("profile.html", p=load_profile())
 
 
 
 @app.route("/contacts")
 def contacts():
-    profile_data = {}
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM profile WHERE id=1")
-        row = cur.fetchone()
-        if row:
-            profile_data = dict(row)
-    return render_template("contacts.html", p=profile_data)
+    return render_template("contacts.html", p=load_profile())
 
 
 @app.route("/first_aid")
@@ -207,23 +607,95 @@ def first_aid():
 @app.route("/dashboard")
 def dashboard():
     """Admin dashboard showing alerts + ambulance status."""
-    with sqlite3.connect(DB_FILE) as conn:
-        cur = conn.cursor()
-        alerts = cur.execute("""
-            SELECT id, created_at, lat, lng, triage_level, notes
-            FROM alerts ORDER BY id DESC
-        """).fetchall()
-
-    ambulances = [
-        {"id": 1, "name": "Ambulance A", "lat": 28.6139, "lng": 77.2090, "status": "available"},
-        {"id": 2, "name": "Ambulance B", "lat": 28.6200, "lng": 77.2150, "status": "busy"},
-        {"id": 3, "name": "Ambulance C", "lat": 28.6250, "lng": 77.2000, "status": "available"},
-    ]
-
-    # auto-refresh every 15 sec
-    return render_template("dashboard.html", alerts=alerts, ambulances=ambulances, refresh=True)
+    conn = get_read_db()
+    # alerts are append-only, so the newest id identifies the page contents;
+    # pages carrying someone's pending flash messages are never cached
+    last_alert_id = conn.execute(SQL_SELECT_MAX_ALERT_ID).fetchone()[0] or 0
+    key = f"dash:{last_alert_id}"
+    cacheable = "_flashes" not in session
+    if cacheable:
+        html = get_cached_page(key)
+        if html is not None:
+            return html
+
+    # rows stream straight into the template while it renders; bounded by the
+    # id read above so an SOS landing in between can't outrun the cache key
+    alerts = iter_rows(conn.execute(SQL_SELECT_ALERTS, (last_alert_id, DASHBOARD_LIMIT)))
+
+    # new alerts arrive over /alerts/stream, no polling refresh
+    html = render_template("dashboard.html", alerts=alerts, ambulances=AMBULANCES,
+                           last_alert_id=last_alert_id)
+    if cacheable:
+        set_cached_page(key, html, DASHBOARD_CACHE_TTL)
+    return html
+
+
+@app.route("/alerts/stream")
+def alerts_stream():
+    """
+    Server-Sent Events feed of new alerts for the dashboard.
+    Alerts after Last-Event-ID (or ?after=<id>) are replayed first.
+    """
+    global _open_streams
+    # parse before taking a slot so bad input can't leak one
+    after = request.headers.get("Last-Event-ID") or request.args.get("after", "")
+    try:
+        last_id = max(int(after), 0) if after else None
+    except ValueError:
+        last_id = None
+
+    with _open_streams_lock:
+        if _open_streams >= MAX_ALERT_STREAMS:
+            return "Too many open alert streams", 503, {"Retry-After": "10"}
+        _open_streams += 1
+
+    def release():
+        global _open_streams
+        events.close()
+        with _open_streams_lock:
+            _open_streams -= 1
+
+    events = alert_events()
+    try:
+        next(events)  # subscribed first, so nothing lands between catch-up and live
+        if last_id is None:
+            last_id = get_read_db().execute(SQL_SELECT_MAX_ALERT_ID).fetchone()[0] or 0
+    except Exception:
+        release()
+        raise
+
+    def stream():
+        # Rows always come from the DB: published alerts and idle ticks only wake
+        # the stream up. Writes are serialized, so alert ids become visible in
+        # increasing order and reading `id > last_id` never skips one, whichever
+        # worker (or process without Redis) took the SOS.
+        nonlocal last_id
+        conn = connect_db(readonly=True)
+        try:
+            for _ in itertools.chain([None], events):
+                rows = conn.execute(SQL_SELECT_ALERTS_AFTER, (last_id, DASHBOARD_LIMIT)).fetchall()
+                for row in rows:
+                    last_id = row["id"]
+                    yield f"id: {row['id']}\ndata: {json.dumps(dict(row))}\n\n"
+                if not rows:
+                    # comment lines flush headers and keep idle connections open through proxies
+                    yield ": keepalive\n\n"
+        finally:
+            conn.close()
+
+    response = Response(stream(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(release)
+    return response
+
+
+# compile every template at startup instead of on its first request
+for name in TEMPLATES:
+    app.jinja_env.get_template(name)
 
 
 # ----------------- MAIN -----------------
+# Development server only. In production run under gunicorn (see gunicorn.conf.py):
+#   gunicorn lifeline:app
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)